@@ -11,13 +11,20 @@
 #
 # © 2025
 
+import asyncio
+import functools
 import re
 import sys
+import threading
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk
 from pathlib import Path
 
-import requests
+try:
+    from winsdk.windows.media.control import GlobalSystemMediaTransportControlsSessionManager as _MEDIA_MANAGER_CLS
+except Exception:  # not on Windows, or winsdk missing; reported when a share is attempted
+    _MEDIA_MANAGER_CLS = None
 
 APP_NAME = "Spotify VRC"
 USER_AGENT = (
@@ -25,6 +32,33 @@ USER_AGENT = (
     "AppleWebKit/537.36 (KHTML, like Gecko) "
     "Chrome/121.0.0.0 Safari/537.36"
 )
+SEARCH_CACHE_TTL = 3600  # seconds to remember a query's YouTube result
+SEARCH_CACHE_MAX = 128  # most queries kept in the search cache
+
+# query (normalized) -> (monotonic timestamp, url)
+_search_cache: dict[str, tuple[float, str]] = {}
+
+# Shared session holding the request headers. Searches abort the body at the first
+# watch id, which closes the socket, so the keep-alive connection is only reused
+# after a response that was read to the end (no match / error page).
+# Created on first search so importing requests doesn't slow down startup.
+_SESSION = None
+
+# Matched against raw bytes: the watch id is ASCII, so no decoding is needed
+_WATCH_RE = re.compile(rb"watch\?v=([a-zA-Z0-9_-]{11})")
+# Bytes carried between chunks so a match split across a boundary is still found
+_WATCH_OVERLAP = len(b"watch?v=") + 11 - 1
+
+# Maps artist separators like "Artist1; Artist2" / "Artist1/Artist2" onto commas
+_ARTIST_SEP_TABLE = str.maketrans({";": ",", "/": ","})
+_GEOMETRY_RE = re.compile(r"(\d+)x(\d+)\+(-?\d+)\+(-?\d+)")
+
+# One event loop reused for every GSMTC read instead of asyncio.run() per click.
+# Created on the first share (in the worker thread), not at import.
+# Shares never overlap (see App._share_busy), so it is only ever run by one thread at a time.
+_LOOP = None
+# GSMTC session manager, requested on first share and kept for the app's lifetime
+_media_manager = None
 
 # --- Helpers ------------------------------------------------------------------
 
@@ -38,60 +72,137 @@ def resource_path(rel_path: str) -> str:
         base_path = Path(__file__).parent
     return str(Path(base_path) / rel_path)
 
+
+def show_error(message: str):
+    """Show an error dialog; messagebox is only imported when actually needed."""
+    from tkinter import messagebox
+    messagebox.showerror(APP_NAME, message)
+
+
+def _get_session():
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        _SESSION = requests.Session()
+        # (requests already sends Accept-Encoding: gzip, deflate and decompresses transparently)
+        _SESSION.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"})
+    return _SESSION
+
+
+def _find_icon() -> str | None:
+    ico_path = resource_path("TaskBarIcon.ico")
+    return ico_path if Path(ico_path).exists() else None
+
+
+# Resolved once at import; None when the icon isn't bundled
+_ICON_PATH = _find_icon()
+
+
+def _parse_geometry(geom: str) -> tuple[int, int, int, int]:
+    """Parse a Tk geometry string "WxH+X+Y" into (w, h, x, y)."""
+    m = _GEOMETRY_RE.fullmatch(geom)
+    if not m:
+        raise ValueError(f"Unexpected geometry: {geom!r}")
+    return tuple(int(g) for g in m.groups())  # type: ignore[return-value]
+
+
 # --- Logic --------------------------------------------------------------------
 
 def youtube_first_result_url(query: str) -> str | None:
     """Return first YouTube watch URL for a query by parsing search HTML (no API key)."""
+    key = query.strip().lower()
+    cached = _search_cache.get(key)
+    if cached and time.monotonic() - cached[0] < SEARCH_CACHE_TTL:
+        return cached[1]
+
+    url = _youtube_search(query)
+    # Only successful lookups are cached so transient failures get retried
+    if url:
+        now = time.monotonic()
+        # Drop expired entries, then the oldest ones if still full (dicts keep insertion order)
+        for k in [k for k, (ts, _) in _search_cache.items() if now - ts >= SEARCH_CACHE_TTL]:
+            del _search_cache[k]
+        _search_cache.pop(key, None)
+        while len(_search_cache) >= SEARCH_CACHE_MAX:
+            del _search_cache[next(iter(_search_cache))]
+        _search_cache[key] = (now, url)
+    return url
+
+
+def _youtube_search(query: str) -> str | None:
+    """Uncached YouTube search; see youtube_first_result_url."""
     base = "https://www.youtube.com/results"
     params = {"search_query": query}
-    headers = {"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"}
-    r = requests.get(base, params=params, headers=headers, timeout=20)
-    if r.status_code != 200:
-        return None
-
-    ids = []
-    for m in re.finditer(r"watch\?v=([a-zA-Z0-9_-]{11})", r.text):
-        vid = m.group(1)
-        if vid not in ids:
-            ids.append(vid)
-    if not ids:
-        return None
-    return f"https://www.youtube.com/watch?v={ids[0]}"
+    with _get_session().get(base, params=params, timeout=20, stream=True) as r:
+        if r.status_code != 200:
+            return None
+
+        # Scan the page as it downloads and stop at the first id, instead of
+        # fetching and decoding the whole (large) results HTML. Leaving the
+        # with-block early closes the connection rather than pooling it; skipping
+        # the rest of the page outweighs a fresh handshake on the next search.
+        tail = b""
+        for chunk in r.iter_content(chunk_size=16384):
+            buf = tail + chunk
+            m = _WATCH_RE.search(buf)
+            if m:
+                return f"https://www.youtube.com/watch?v={m.group(1).decode('ascii')}"
+            tail = buf[-_WATCH_OVERLAP:]
+    return None
+
+
+def _app_id(session) -> str:
+    try:
+        return session.source_app_user_model_id or ""
+    except Exception:
+        return ""
 
 
 def get_local_now_playing():
     """Windows GSMTC: read the currently playing media title and artist."""
-    try:
-        import asyncio  # noqa: F401
-        from winsdk.windows.media.control import GlobalSystemMediaTransportControlsSessionManager as MediaManager
-    except Exception as e:
-        raise RuntimeError("Windows 'Now Playing' requires the 'winsdk' package. Install: pip install winsdk") from e
+    if _MEDIA_MANAGER_CLS is None:
+        raise RuntimeError("Windows 'Now Playing' requires the 'winsdk' package. Install: pip install winsdk")
 
     async def _get():
-        mgr = await MediaManager.request_async()
-        sessions = mgr.get_sessions()
-        # Prefer Spotify if present
+        global _media_manager
+        if _media_manager is None:
+            _media_manager = await _MEDIA_MANAGER_CLS.request_async()
+        mgr = _media_manager
+        # Start reading the current session's properties while scanning for Spotify;
+        # they are the answer when Spotify is the current session or isn't running
+        current = mgr.get_current_session()
+        current_props = asyncio.ensure_future(current.try_get_media_properties_async()) if current else None
         spotify_session = None
-        for s in sessions:
-            try:
-                appid = s.source_app_user_model_id or ""
-            except Exception:
-                appid = ""
-            if "Spotify" in appid:
-                spotify_session = s
-                break
-        session = spotify_session or mgr.get_current_session()
-        if not session:
+        if not (current and "Spotify" in _app_id(current)):
+            # Prefer Spotify if present
+            for s in mgr.get_sessions():
+                if "Spotify" in _app_id(s):
+                    spotify_session = s
+                    break
+        if spotify_session:
+            # Spotify exists but isn't current. Only the asyncio wrapper is
+            # cancelled here; the WinRT read itself still runs to completion.
+            if current_props:
+                current_props.cancel()
+            props = await spotify_session.try_get_media_properties_async()
+        elif current_props:
+            props = await current_props
+        else:
+            return None, None
+        try:
+            title = (props.title or "").strip()
+            artist = (props.artist or "").strip()
+        except AttributeError:  # props may be None when the session has no media info
             return None, None
-        props = await session.try_get_media_properties_async()
-        title = (getattr(props, "title", "") or "").strip()
-        artist = (getattr(props, "artist", "") or "").strip()
         # Normalize separators like "Artist1; Artist2"
-        artist = ", ".join([a.strip() for a in re.split(r"[;/]", artist) if a.strip()]) or artist
+        if ";" in artist or "/" in artist:
+            artist = ", ".join(filter(None, (a.strip() for a in artist.translate(_ARTIST_SEP_TABLE).split(",")))) or artist
         return title, artist
 
-    import asyncio
-    return asyncio.run(_get())
+    global _LOOP
+    if _LOOP is None:
+        _LOOP = asyncio.new_event_loop()
+    return _LOOP.run_until_complete(_get())
 
 # --- UI -----------------------------------------------------------------------
 
@@ -103,17 +214,20 @@ class App(tk.Tk):
         self.attributes("-topmost", True)  # Always on top
 
         # Try to set window icon (works in dev and PyInstaller, when icon bundled via --add-data)
-        try:
-            ico_path = resource_path("TaskBarIcon.ico")
-            if Path(ico_path).exists():
-                self.iconbitmap(ico_path)
-        except Exception:
-            pass
+        if _ICON_PATH:
+            try:
+                self.iconbitmap(_ICON_PATH)
+            except Exception:
+                pass
 
         # state for overlay timers
-        self._overlay = None
         self._overlay_after_id = None
-        self._fade_after_id = None
+        self._fade_after_ids = []
+        self._alpha_supported = True
+
+        # set while a share is running in the background worker
+        self._share_busy = False
+        self._last = None  # tuple(track, artist, url) of the last successful share
 
         self._init_dark_theme()
         self._build_ui()
@@ -171,127 +285,149 @@ class App(tk.Tk):
         )
         self.share_btn.pack(padx=0, pady=0)
 
+        # Borderless, topmost overlay: built once and shown/withdrawn on demand
+        self._overlay = tk.Toplevel(self)
+        self._overlay.withdraw()
+        self._overlay.overrideredirect(True)
+        self._overlay.attributes("-topmost", True)
+        # Probe alpha support once; the fade is skipped entirely without it
+        try:
+            self._overlay.attributes("-alpha", 0.98)
+            self._alpha_supported = True
+        except Exception:
+            self._alpha_supported = False  # alpha may not be supported in rare environments
+        self._overlay.configure(bg=self.overlay_bg)
+
+        # Content label
+        self._overlay_label = tk.Label(
+            self._overlay,
+            bg=self.overlay_bg,
+            fg=self.overlay_fg,
+            font=("Segoe UI", 12, "bold"),
+            padx=12,
+            pady=6,
+            bd=1,
+            relief="ridge"
+        )
+        self._overlay_label.pack()
+
     # --- Overlay helpers ---
     def _hide_overlay(self):
-        # Cancel timers and destroy overlay toplevel if present
+        # Cancel timers and withdraw the overlay
         if self._overlay_after_id is not None:
             try:
                 self.after_cancel(self._overlay_after_id)
             except Exception:
                 pass
             self._overlay_after_id = None
-        if self._fade_after_id is not None:
+        for after_id in self._fade_after_ids:
             try:
-                self.after_cancel(self._fade_after_id)
+                self.after_cancel(after_id)
             except Exception:
                 pass
-            self._fade_after_id = None
-        if self._overlay is not None:
-            try:
-                self._overlay.destroy()
-            except Exception:
-                pass
-            self._overlay = None
+        self._fade_after_ids = []
+        self._overlay.withdraw()
 
-    def _show_overlay(self, text: str, duration_ms: int = 2000, fade_ms: int = 500):
-        # Remove existing overlay
+    def _show_overlay(self, text: str, duration_ms: int | None = 2000, fade_ms: int = 500):
+        # Reset any overlay still showing
         self._hide_overlay()
 
-        # Ensure geometry is up to date
-        self.update_idletasks()
-
-        # Create borderless, topmost toplevel overlay
-        overlay = tk.Toplevel(self)
-        overlay.overrideredirect(True)
-        overlay.attributes("-topmost", True)
-        try:
+        overlay = self._overlay
+        self._overlay_label.configure(text=text)
+        if self._alpha_supported:
             overlay.attributes("-alpha", 0.98)
-        except Exception:
-            pass  # alpha may not be supported in rare environments
-        overlay.configure(bg=self.overlay_bg)
 
-        # Content label
-        lbl = tk.Label(
-            overlay,
-            text=text,
-            bg=self.overlay_bg,
-            fg=self.overlay_fg,
-            font=("Segoe UI", 12, "bold"),
-            padx=12,
-            pady=6,
-            bd=1,
-            relief="ridge"
-        )
-        lbl.pack()
-
-        # Position: bottom flush with window bottom, centered to the Share button
+        # Position: bottom flush with window bottom, centered to the Share button.
+        # Geometry is read as "WxH+X+Y" strings to keep Tcl round-trips down.
+        self.update_idletasks()
+        ow, oh = overlay.winfo_reqwidth(), overlay.winfo_reqheight()
+        rx, ry = self.winfo_rootx(), self.winfo_rooty()
         try:
-            self.update_idletasks()
-            bx, by = self.share_btn.winfo_rootx(), self.share_btn.winfo_rooty()
-            bw, bh = self.share_btn.winfo_width(), self.share_btn.winfo_height()
-
-            overlay.update_idletasks()
-            ow, oh = overlay.winfo_reqwidth(), overlay.winfo_reqheight()
-
-            root_bottom = self.winfo_rooty() + self.winfo_height()
-            x = int(bx + (bw - ow) / 2)
-            y = int(root_bottom - oh)
-            overlay.geometry(f"{ow}x{oh}+{x}+{y}")
+            # The button sits in a padding-free container at the root's origin,
+            # so its geometry offsets are relative to the root's client area
+            bw, bh, bx, by = _parse_geometry(self.share_btn.winfo_geometry())
+            _, rh, _, _ = _parse_geometry(self.winfo_geometry())
+            x = int(rx + bx + (bw - ow) / 2)
+            y = int(ry + rh - oh)
         except Exception:
             # Fallback: center of root
-            rx = self.winfo_rootx()
-            ry = self.winfo_rooty()
-            rw = self.winfo_width()
-            rh = self.winfo_height()
-            overlay.update_idletasks()
-            ow, oh = overlay.winfo_reqwidth(), overlay.winfo_reqheight()
+            rw, rh = self.winfo_width(), self.winfo_height()
             x = int(rx + (rw - ow) / 2)
             y = int(ry + rh - oh)
-            overlay.geometry(f"{ow}x{oh}+{x}+{y}")
+        overlay.geometry(f"{ow}x{oh}+{x}+{y}")
 
-        self._overlay = overlay
+        overlay.deiconify()
+        if duration_ms is None:
+            return  # stays up until _hide_overlay is called
 
         # Fade parameters
         steps = 10
         step_ms = max(10, int(fade_ms / steps))
 
-        def _fade_step(i: int):
-            try:
-                alpha = max(0.0, 0.98 * (1 - i / steps))
-                try:
-                    overlay.attributes("-alpha", alpha)
-                except Exception:
-                    pass
-                if i < steps:
-                    self._fade_after_id = self.after(step_ms, lambda: _fade_step(i + 1))
-                else:
-                    self._hide_overlay()
-            except Exception:
-                self._hide_overlay()
-
-        # Schedule fade after hold
-        self._overlay_after_id = self.after(max(0, duration_ms - fade_ms), lambda: _fade_step(1))
+        # Schedule every fade frame up front, then hide once the last one has run
+        hold_ms = max(0, duration_ms - fade_ms)
+        if not self._alpha_supported:
+            self._overlay_after_id = self.after(hold_ms + (steps - 1) * step_ms, self._hide_overlay)
+            return
+        self._fade_after_ids = [
+            self.after(hold_ms + (i - 1) * step_ms,
+                       functools.partial(self._set_alpha, max(0.0, 0.98 * (1 - i / steps))))
+            for i in range(1, steps + 1)
+        ]
+        self._overlay_after_id = self.after(hold_ms + (steps - 1) * step_ms, self._hide_overlay)
+
+    def _set_alpha(self, alpha: float):
+        # Only scheduled when alpha is supported, and the overlay lives as long as the app
+        self._overlay.attributes("-alpha", alpha)
 
     # --- Actions ---
     def share_song_url(self):
+        # Ignore repeat clicks while a lookup is still in flight
+        if self._share_busy:
+            return
+        self._share_busy = True
+        # No auto-hide: the search can outlast any fixed hold; _finish_share hides it
+        self._show_overlay("searching...", duration_ms=None)
+        # GSMTC read and YouTube search are slow; keep them off the Tk main loop
+        threading.Thread(target=self._do_share, daemon=True).start()
+
+    def _do_share(self):
+        # Runs on the worker thread: no Tk calls here except self.after
+        track = url = error = None
         try:
             track, artist = get_local_now_playing()
+            if track:
+                if self._last and self._last[:2] == (track, artist):
+                    # Same song as last time: reuse its URL without searching again
+                    url = self._last[2]
+                else:
+                    query = f"{track} {artist}".strip()
+                    url = youtube_first_result_url(query)
+                    if url:
+                        self._last = (track, artist, url)
+        except Exception as e:
+            error = e
+        self.after(0, lambda: self._finish_share(track, url, error))
+
+    def _finish_share(self, track, url, error):
+        self._share_busy = False
+        self._hide_overlay()
+        try:
+            if error is not None:
+                raise error
             if not track:
                 # Transient overlay instead of a message box
                 self._show_overlay("no track is playing", duration_ms=2000, fade_ms=500)
                 return
-
-            query = f"{track} {artist}".strip()
-            url = youtube_first_result_url(query)
             if not url:
-                messagebox.showerror(APP_NAME, "Couldn't find a YouTube result.")
+                show_error("Couldn't find a YouTube result.")
                 return
 
             # Copy silently to clipboard
             self.clipboard_clear()
             self.clipboard_append(url)
         except Exception as e:
-            messagebox.showerror(APP_NAME, f"Error: {e}")
+            show_error(f"Error: {e}")
 
 
 if __name__ == "__main__":
@@ -300,6 +436,6 @@ if __name__ == "__main__":
         app.mainloop()
     except Exception as ex:
         try:
-            messagebox.showerror(APP_NAME, f"Fatal error: {ex}")
+            show_error(f"Fatal error: {ex}")
         except Exception:
             print(f"Fatal error: {ex}")